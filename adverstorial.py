@@ -1,7 +1,8 @@
 import argparse
 import cast_str
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+import difflib
 import json
 import os
 import logging
@@ -9,6 +10,8 @@ import random
 import uuid
 import ssl
 import re
+import sys
+import time
 from urllib.parse import urljoin, urlencode, urlparse, parse_qsl, urlunparse
 from typing import Optional, List, Any
 from urllib import request as urllib_request, error as urllib_error
@@ -46,6 +49,18 @@ else:
 
 BLOB_STORAGE_PATH = os.environ.get("BLOB_STORAGE_PATH", "")
 
+# batch mode (provider batch-job APIs); BATCH_API_URL replaces PAYI_PROXY_URL for batch calls (e.g. a local stand-in)
+BATCH_API_URL = os.environ.get("BATCH_API_URL", "")
+BATCH_DIR = os.environ.get("BATCH_DIR", os.path.join(ADVERSTORIAL_DIR, "batches"))
+BATCH_POLL_INTERVAL = cast_str.to_float(os.environ.get("BATCH_POLL_INTERVAL", "60"), 60.0)
+BATCH_TIMEOUT = cast_str.to_float(os.environ.get("BATCH_TIMEOUT", "86400"), 86400.0)
+BATCH_RETRIES = cast_str.to_int(os.environ.get("BATCH_RETRIES", "5"))
+
+# context compaction for later rounds; COMPACT_ROLES opts roles in by type or provider.model
+COMPACT_ROLES = cast_str.to_list(os.environ.get("COMPACT_ROLES", ""), ",", [])
+COMPACT_MAX_FACTS = cast_str.to_int(os.environ.get("COMPACT_MAX_FACTS", "8"))
+COMPACT_MIN_SIMILARITY = cast_str.to_float(os.environ.get("COMPACT_MIN_SIMILARITY", "0.6"), 0.6)
+
 raw_adversaries = os.environ.get("ADVERSARIES", "")
 adversary_choices = [value.strip() for value in raw_adversaries.split(",") if value.strip()]
 raw_protagonists = os.environ.get("PROTAGONISTS", "")
@@ -187,16 +202,50 @@ class Role:
       return f"{self.type} ({self.provider}.{self.model}/{self.category}:{self.resource})"
     return f"{self.type} ({self.provider}.{self.model})"
 
+@dataclass(frozen=True)
+class BatchTurn:
+  """A single turn request queued for a provider batch job."""
+  role: Role
+  message: str
+  game_id: str
+  use_case_step: str
+  instructions: str = ""
+
+  @property
+  def custom_id(self) -> str:
+    # Anthropic limits custom_id to [a-zA-Z0-9_-]{1,64}
+    return f"{self.game_id}-{self.use_case_step}"
+
 @dataclass(frozen=True)
 class Story:
   title: str
   content: str
   lines: List[str]
   request_id: Optional[str] = None
+  input_tokens: Optional[int] = None  # measured usage of the request that wrote it
 
   def __str__(self):
     return f"Title: {self.title}\n\n{self.content}\n\nThe End\n"
 
+@dataclass(frozen=True)
+class CompactStory:
+  """Compact view of a story: fixed beginning/ending (abridged), established names/facts and the editable middle."""
+  title: str
+  beginning: str  # full text, abridged sentences are restored by rebuild_story
+  middle: str
+  ending: str  # full text, abridged sentences are restored by rebuild_story
+  names: List[str]
+  facts: List[str]
+
+  def __str__(self):
+    return (
+      f"Title: {self.title}\n\n"
+      f"[BEGINNING: {abridge(self.beginning)}]\n\n"
+      f"{self.middle}\n\n"
+      f"[ENDING: {abridge(self.ending)}]\n\n"
+      f"The End\n"
+    )
+
 def parse_role(value: str, type: str) -> Role:
   known_providers = {"openai", "azure.openai", "anthropic"}
   model = ""
@@ -274,11 +323,10 @@ def parse_story(raw: str, request_id: Optional[str] = None) -> Optional[Story]:
   return Story(title=title, content=content, lines=lines, request_id=request_id)
 
 
-def game_loop(prompt, protagonist: Role, antagonist: Role, rounds: int):
-  global instructions
+def start_game(prompt, protagonist: Role, antagonist: Role, rounds: int) -> tuple[str, List[Role]]:
+  """Toss the coin for turn order and ingest the game-start sentinel. Returns (game_id, order)."""
   order = [protagonist, antagonist]
   random.shuffle(order)
-  story: Optional[Story] = None
   game_id = uuid.uuid4().hex
 
   # make sure the sentinel type exists and otherwise create it
@@ -322,35 +370,188 @@ def game_loop(prompt, protagonist: Role, antagonist: Role, rounds: int):
     "xProxy-UseCase-Name": "Story",
     "xProxy-UseCase-ID": game_id,
   })
+  return game_id, order
+
+
+def compaction_enabled(role: Role) -> bool:
+  """Check whether the role opted in to context compaction via COMPACT_ROLES."""
+  return role.type in COMPACT_ROLES or f"{role.provider}.{role.model}" in COMPACT_ROLES
+
+
+# models sometimes drop the outer brackets, but the upper-case label and colon are required
+PLACEHOLDER_PATTERN = re.compile(r"^\s*\[?(BEGINNING|ENDING):(.*?)\]?\s*$", re.DOTALL)
+# marks the sentences hidden by abridge(); "..." and "…" are accepted back from models too
+ABRIDGE_MARK = "[...]"
+ABRIDGE_MARK_PATTERN = re.compile(r"\s*\[\s*(?:\.\.\.|…)\s*\]\s*")
+ELLIPSIS_PATTERN = re.compile(r"\s+(?:\.\.\.|…)\s+")
+
+
+def split_paragraphs(text: str) -> List[str]:
+  return [p.strip() for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+
+
+def split_sentences(text: str, breaks: str = ".!?") -> List[str]:
+  return [s for s in re.split(rf"(?<=[{breaks}][\"'”’])\s+|(?<=[{breaks}])\s+", text.strip()) if s]
+
+
+def abridge(paragraph: str) -> str:
+  """Shorten a paragraph to its first and last sentences."""
+  sentences = split_sentences(paragraph)
+  if len(sentences) <= 2:
+    return paragraph
+  return f"{sentences[0]} {ABRIDGE_MARK} {sentences[-1]}"
+
+
+def story_names(text: str) -> List[str]:
+  """Find capitalized words used mid-sentence (names of people, places and things) in order of appearance."""
+  names = []
+  # clause breaks count too so the word after "…", ";" or ":" isn't mistaken for a name
+  for sentence in split_sentences(text, breaks=".!?…;:"):
+    # skip the first word and words opening a quotation since those are capitalized anyway
+    for match in re.finditer(r"(?<![\w“\"‘'])([A-Z][a-z]+)(?:[’'][a-z]+)?", sentence):
+      name = match.group(1)
+      if match.start() == 0 or sentence[:match.start()].rstrip().endswith(("“", "\"", "‘", "'")):
+        continue
+      if name not in names:
+        names.append(name)
+  return names
+
+
+def compact_story(story: Story) -> Optional[CompactStory]:
+  """Build the compact view of a story, or None if it is too short to compact."""
+  paragraphs = split_paragraphs(story.content)
+  if len(paragraphs) < 3:
+    return None
+  beginning, middle, ending = paragraphs[0], "\n\n".join(paragraphs[1:-1]), paragraphs[-1]
+  names = story_names(story.content)
+
+  # sentences abridged away from the beginning/ending are kept as facts only if they
+  # carry a name or number the player would otherwise not see anywhere
+  visible = " ".join([abridge(beginning), middle, abridge(ending)])
+  facts = []
+  for paragraph in (beginning, ending):
+    for sentence in split_sentences(paragraph)[1:-1]:
+      unseen = [n for n in names if n in sentence and n not in visible]
+      unseen += [d for d in re.findall(r"\d+", sentence) if d not in visible]
+      if unseen and len(facts) < COMPACT_MAX_FACTS:
+        facts.append(sentence)
+  return CompactStory(title=story.title, beginning=beginning, middle=middle, ending=ending, names=names, facts=facts)
+
+
+def normalize_abridged(text: str) -> str:
+  """Strip abridgement marks and collapse whitespace for comparing placeholder text."""
+  text = ABRIDGE_MARK_PATTERN.sub(" ", text)
+  return re.sub(r"\s+", " ", ELLIPSIS_PATTERN.sub(" ", text)).strip()
+
+
+def rebuild_story(compact: CompactStory, returned: Story) -> Story:
+  """Expand the [BEGINNING: ...]/[ENDING: ...] placeholders in the returned story.
+  The abridged sentences are restored around whatever the player wrote inside the placeholder, so edits are kept."""
+  paragraphs = []
+  for paragraph in split_paragraphs(returned.content):
+    match = PLACEHOLDER_PATTERN.match(paragraph)
+    if match:
+      original = compact.beginning if match.group(1) == "BEGINNING" else compact.ending
+      text = match.group(2).strip()
+      hidden = split_sentences(original)[1:-1]
+      parts = ABRIDGE_MARK_PATTERN.split(text)
+      if len(parts) != 2 and normalize_abridged(text) == normalize_abridged(abridge(original)):
+        text = original  # unchanged but the mark was mangled
+      elif len(parts) != 2:
+        parts = ELLIPSIS_PATTERN.split(text)
+      if len(parts) == 2 and hidden:
+        text = " ".join([parts[0].strip()] + hidden + [parts[1].strip()])
+      paragraph = text or original
+    paragraphs.append(paragraph)
+  return replace(returned, content="\n\n".join(paragraphs))
+
+
+def check_story(previous: Story, story: Story, names: List[str]) -> List[str]:
+  """Check a rewritten story against its previous version and the established names. Returns a list of rule violations."""
+  problems = []
+  if story.title.strip().lower() != previous.title.strip().lower():
+    problems.append(f"title changed from {previous.title!r} to {story.title!r}")
+  before = split_paragraphs(previous.content)
+  after = split_paragraphs(story.content)
+  if not before:
+    return problems  # nothing established yet to compare against
+  if not after:
+    return problems + ["story is empty"]
+  for label, old, new in (("beginning", before[0], after[0]), ("ending", before[-1], after[-1])):
+    ratio = difflib.SequenceMatcher(None, old, new, autojunk=False).ratio()
+    if ratio < COMPACT_MIN_SIMILARITY:
+      problems.append(f"{label} changed (similarity {ratio:.2f})")
+  if len(before) >= 3:
+    middle = after[1:-1]
+    if not middle:
+      problems.append("middle removed")
+    for label, old in (("beginning", before[0]), ("ending", before[-1])):
+      if any(difflib.SequenceMatcher(None, old, paragraph, autojunk=False).ratio() >= 0.9 for paragraph in middle):
+        problems.append(f"{label} repeated in the middle")
+  missing = [name for name in names if name not in story.content]
+  if missing:
+    problems.append(f"names removed: {', '.join(missing)}")
+  return problems
+
+
+def turn_message(prompt, order: List[Role], role: Role, round_num: int, story: Optional[Story], compact: Optional[CompactStory] = None) -> str:
+  """Build the message sent to the role for its turn."""
+  other_role = order[1] if role == order[0] else order[0]
+  current = [
+    f"* Coin toss winner: {order[0].type}",
+    f"* Seed prompt: {prompt}",
+    f"* It is round {round_num}, turn {order.index(role) + 1} of 2.",
+    f"* I am writing on the side of the {other_role.type}.",
+    f"* You are writing on the side of the {role.type}.",
+  ]
+
+  if story:
+    current.append(f"* Story Title: {story.title}")
+  if compact:
+    current.append("* Previous round data has been truncated for brevity.")
+    current.append(f"* The beginning and ending are abridged below; keep their [BEGINNING: ...] and [ENDING: ...] lines (you may embellish the text inside them) and the sentences hidden by {ABRIDGE_MARK} will be restored.")
+    if compact.names:
+      current.append(f"* Established names: {', '.join(compact.names)}")
+    for fact in compact.facts:
+      current.append(f"* Established fact: {fact}")
+
+  if not story:
+    request = f"You won the coin toss so you go first: {prompt}"
+  elif compact:
+    request = str(compact)
+  else:
+    request = str(story)
+
+  return "\n".join(current) + "\n\n" + request
+
+
+def game_loop(prompt, protagonist: Role, antagonist: Role, rounds: int, game_id: str = "", order: Optional[List[Role]] = None, story: Optional[Story] = None):
+  """Play a game. Pass game_id, order and story to resume after an already written first turn (see batch_game_loop)."""
+  global instructions
+  if not game_id or not order:
+    game_id, order = start_game(prompt, protagonist, antagonist, rounds)
 
   for round_num in range(1, rounds + 1):
     for role in order:
+      if round_num == 1 and role == order[0] and story:
+        continue  # first turn was already written (batch mode)
+
       logger.info("")
       logger.info(f"### Round {round_num} of {rounds} / Turn {order.index(role) + 1} of 2")
 
       use_case_step = f"round-{round_num}-turn-{order.index(role) + 1}-write"
-      other_role = order[1] if role == order[0] else order[0]
-      current = [
-        f"* Coin toss winner: {order[0].type}",
-        f"* Seed prompt: {prompt}",
-        f"* It is round {round_num}, turn {order.index(role) + 1} of 2.",
-        f"* I am writing on the side of the {other_role.type}.",
-        f"* You are writing on the side of the {role.type}.",
-      ]
-
-      if story:
-        current.append(f"* Story Title: {story.title}")
-      if round_num > 1:
-        current.append("* Previous round data has been truncated for brevity.")
-
-      if not story:
-        request = f"You won the coin toss so you go first: {prompt}"
-      else:
-        request = str(story)
-
+      compact = None
+      if story and round_num > 1 and compaction_enabled(role):
+        compact = compact_story(story)
+      message = turn_message(prompt, order, role, round_num, story, compact=compact)
+      full_message = turn_message(prompt, order, role, round_num, story) if compact else message
+      if compact and len(message) >= len(full_message):
+        logger.info("Compacted story is not smaller, sending the full story")
+        compact = None
+        message = full_message
       kwargs = {
         "role": role,
-        "message": "\n".join(current) + "\n\n" + request,
+        "message": message,
         "id": game_id,
         "instructions": instructions,
         "use_case_step": use_case_step,
@@ -364,6 +565,29 @@ def game_loop(prompt, protagonist: Role, antagonist: Role, rounds: int):
       if not new_story:
         add_game_property(game_id, "system.failure", "parse_story")
         raise Exception("Failed to parse story")
+
+      if compact:
+        new_story = rebuild_story(compact, new_story)
+        if new_story.input_tokens:
+          # the full message was never sent so the saving is scaled from the measured input tokens,
+          # which also cover the (unchanged) instructions
+          saved_tokens = round(new_story.input_tokens * (len(full_message) - len(message)) / (len(instructions) + len(message)))
+          logger.info(f"Compaction: {new_story.input_tokens} input tokens, ~{saved_tokens} saved")
+          if new_story.request_id:
+            add_property(new_story.request_id, "compaction.input_tokens", str(new_story.input_tokens))
+            add_property(new_story.request_id, "compaction.input_tokens_saved", str(saved_tokens))
+
+      # compaction changes what players see, so once a game uses it the rules are checked for both sides alike
+      if story and any(compaction_enabled(r) for r in order):
+        established = compact or compact_story(story)
+        problems = check_story(story, new_story, established.names if established else [])
+        if problems:
+          # per the rules a violating turn is lost and its edits discarded
+          logger.warning(f"Discarding turn from {role}: {'; '.join(problems)}")
+          if new_story.request_id:
+            add_property(new_story.request_id, "system.failure", "check_story")
+            add_property(new_story.request_id, "system.failure.description", "; ".join(problems))
+          continue
       story = new_story
 
   if story and story.title:
@@ -373,18 +597,15 @@ def game_loop(prompt, protagonist: Role, antagonist: Role, rounds: int):
   return story
     
 
-def write_story(role: Role, message: str, id: str = "", instructions: str = "", use_case_step: str = "") -> Story | None:
+def provider_route(role: Role, path: str, id: str = "", base_url: str = "", management: bool = False) -> tuple[str, dict]:
+  """Build the proxy URL and headers for a provider API path (e.g. "responses").
+  Management calls (batch uploads and polls) are not shadowed and get no proxy route params."""
+  base_url = base_url or PAYI_PROXY_URL
   route_params = {}
-  if PAYI_PROXY_DIRECT:
+  if PAYI_PROXY_DIRECT and not management:
     route_params["direct"] = "1"
-  if PAYI_PROXY_INGEST:
+  if PAYI_PROXY_INGEST and not management:
     route_params["ingest"] = "1"
-  # if TEMPERATURE is a range like "0.4,1.0", pick a random float in that range
-  # otherwise use as-is for float
-  temperature = cast_str.to_float(TEMPERATURE, 0.7) if "," not in TEMPERATURE else random.uniform(*[
-      cast_str.to_float(x.strip(), 0.7) for x in TEMPERATURE.split(",")[:2]
-  ])
-  logger.info(f"Temperature: {temperature:.6f} (from {TEMPERATURE})")
 
   # Initialize proxy_url and headers
   proxy_url = ""
@@ -392,14 +613,14 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
 
   # OpenAI
   if role.provider == "openai":
-    proxy_url = urljoin(PAYI_PROXY_URL, os.path.join(role.provider, "v1/responses"))
+    proxy_url = urljoin(base_url, os.path.join(role.provider, "v1", path))
     headers = {
       "Authorization": f"Bearer {os.environ['OPENAI_API_KEY']} {os.environ['PAYI_API_KEY']}",
     }
 
   # Azure
   elif role.provider == "azure.openai":
-    proxy_url = urljoin(PAYI_PROXY_URL, os.path.join(role.provider, "openai/v1/responses"))
+    proxy_url = urljoin(base_url, os.path.join(role.provider, "openai/v1", path))
     headers = {
       "api-key": f"{os.environ['AZURE_OPENAI_API_KEY']} {os.environ['PAYI_API_KEY']}",
       "xProxy-Provider-BaseUri": os.environ["AZURE_OPENAI_BASE_URI"],
@@ -407,7 +628,7 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
 
   # Anthropic
   elif role.provider == "anthropic":
-    proxy_url = urljoin(PAYI_PROXY_URL, os.path.join(role.provider, "v1/messages"))
+    proxy_url = urljoin(base_url, os.path.join(role.provider, "v1", path))
     headers = {
       "anthropic-version": "2023-06-01",
       "x-api-key": f"Bearer {os.environ['ANTHROPIC_API_KEY']} {os.environ['PAYI_API_KEY']}",
@@ -424,6 +645,35 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
   if role.category != f"system.{role.provider}":
     headers["xProxy-PriceAs-Category"] = role.category
 
+  headers["xProxy-UseCase-Name"] = "Story"
+  if id:
+    headers["xProxy-UseCase-ID"] = id
+
+  # Enable shadowing to Azure Blob Storage if configured
+  if BLOB_STORAGE_PATH and not management:
+    # use YYYY/MM/DD/id as the blob path
+    now = datetime.now(timezone.utc)
+    date_path = now.strftime("%Y/%m/%d")
+    relpath = f"{date_path}/{id}"
+    headers["X-Shadow"] = f"{BLOB_STORAGE_PATH}/{relpath} {os.environ['BLOB_STORAGE_TOKEN']}"
+
+  # Add route params
+  if len(route_params):
+    proxy_url += "/"
+    proxy_url += "/".join([f"{k}:{v}" for k,v in route_params.items()])
+
+  return proxy_url, headers
+
+
+def story_request_body(role: Role, message: str, instructions: str = "") -> dict:
+  """Build the provider JSON body asking the role to write a story."""
+  # if TEMPERATURE is a range like "0.4,1.0", pick a random float in that range
+  # otherwise use as-is for float
+  temperature = cast_str.to_float(TEMPERATURE, 0.7) if "," not in TEMPERATURE else random.uniform(*[
+      cast_str.to_float(x.strip(), 0.7) for x in TEMPERATURE.split(",")[:2]
+  ])
+  logger.info(f"Temperature: {temperature:.6f} (from {TEMPERATURE})")
+
   # OpenAI and Azure OpenAI share the same request format
   if role.provider.endswith("openai"):
     request = {
@@ -450,24 +700,16 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
         }
       ],
     }
+  else:
+    raise NotImplementedError(f"Provider {role.provider} is not implemented yet.")
+  return request
 
-  headers["Content-Type"] = "application/json"
-  headers["xProxy-UseCase-Name"] = "Story"
-  if id:
-    headers["xProxy-UseCase-ID"] = id
-
-  # Enable shadowing to Azure Blob Storage if configured
-  if BLOB_STORAGE_PATH:
-    # use YYYY/MM/DD/id as the blob path
-    now = datetime.now(timezone.utc)
-    date_path = now.strftime("%Y/%m/%d")
-    relpath = f"{date_path}/{id}"
-    headers["X-Shadow"] = f"{BLOB_STORAGE_PATH}/{relpath} {os.environ['BLOB_STORAGE_TOKEN']}"
 
-  # Add route params
-  if len(route_params):
-    proxy_url += "/"
-    proxy_url += "/".join([f"{k}:{v}" for k,v in route_params.items()])
+def write_story(role: Role, message: str, id: str = "", instructions: str = "", use_case_step: str = "") -> Story | None:
+  path = "messages" if role.provider == "anthropic" else "responses"
+  proxy_url, headers = provider_route(role, path, id=id)
+  headers["Content-Type"] = "application/json"
+  request = story_request_body(role, message, instructions=instructions)
 
   try:
     logger.info("HTTP: %s", proxy_url)
@@ -490,6 +732,11 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
     return None
 
   request_id = parse_request_id(role, json_response)
+  return receive_story(role, response, json_response, request_id, use_case_step)
+
+
+def receive_story(role: Role, response: SimpleHTTPResponse, json_response: dict, request_id: Optional[str], use_case_step: str = "") -> Story | None:
+  """Tag the Pay-i request with its properties and parse the story out of the provider JSON."""
   if request_id:
     add_property(request_id, "role", role.type)
     add_property(request_id, "system.user_id",
@@ -502,13 +749,332 @@ def write_story(role: Role, message: str, id: str = "", instructions: str = "",
   logger.info(f"// Begin {role} response:")
   logger.info(text)
   logger.info(f"// End of {role} response")
+  usage = json_response.get("usage") or {}
   try:
-    return parse_story(text, request_id=request_id)
+    return replace(parse_story(text, request_id=request_id), input_tokens=usage.get("input_tokens"))
   except Exception as e:
     add_property(request_id, "system.failure", "parse_story")
     add_property(request_id, "system.failure.description", str(e))
   return None
 
+def batch_game_loop(prompts: List[str], protagonist: Role, antagonist: Role, rounds: int) -> List[Optional[Story]]:
+  """Play one game per prompt, writing all first turns through provider batch jobs."""
+  global instructions
+  games = []
+  for prompt in prompts:
+    game_id, order = start_game(prompt, protagonist, antagonist, rounds)
+    turn = BatchTurn(
+      role=order[0],
+      message=turn_message(prompt, order, order[0], 1, None),
+      game_id=game_id,
+      use_case_step="round-1-turn-1-write",
+      instructions=instructions,
+    )
+    games.append((prompt, order, turn))
+
+  manifests = submit_batches(games, protagonist, antagonist, rounds)
+  return finish_batch_games(manifests)
+
+
+def role_value(role: Role) -> str:
+  """Inverse of parse_role (without the type)."""
+  value = f"{role.provider}.{role.model}"
+  if role.resource:
+    default_category = f"system.{role.provider}" if role.provider != "azure.openai" else "system.azureopenai"
+    value += f"/{role.category}:{role.resource}" if role.category != default_category else f"/{role.resource}"
+  return value
+
+
+def submit_batches(games: List[tuple], protagonist: Role, antagonist: Role, rounds: int) -> List[str]:
+  """Write and submit one batch job per role, saving a manifest next to each JSONL file so the run can be resumed.
+  Takes (prompt, order, turn) tuples and returns the manifest paths."""
+  # one batch job per role since every request in a job must target the same provider/model
+  groups = {}
+  for prompt, order, turn in games:
+    groups.setdefault(turn.role, []).append((prompt, order, turn))
+
+  os.makedirs(BATCH_DIR, exist_ok=True)
+  timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+  manifests = []
+  for index, (role, group) in enumerate(groups.items()):
+    base = os.path.join(BATCH_DIR, f"{timestamp}-{index}-{role.type}-{role.provider}-{role.model}")
+    write_batch_file(role, [turn for _, _, turn in group], base + ".jsonl")
+    batch_id = submit_batch(role, base + ".jsonl")
+    if batch_id:
+      logger.info(f"Submitted batch {batch_id} for {role} ({len(group)} turns)")
+    else:
+      logger.error(f"Failed to submit batch for {role} ({len(group)} turns)")
+
+    manifest = {
+      "batch_id": batch_id or "",
+      "role": role.type,
+      "protagonist": role_value(protagonist),
+      "antagonist": role_value(antagonist),
+      "rounds": rounds,
+      "games": [{
+        "custom_id": turn.custom_id,
+        "game_id": turn.game_id,
+        "prompt": prompt,
+        "order": [r.type for r in order],
+        "use_case_step": turn.use_case_step,
+      } for prompt, order, turn in group],
+    }
+    save_manifest(base + ".batch.json", manifest)
+    manifests.append(base + ".batch.json")
+  return manifests
+
+
+def save_manifest(path: str, manifest: dict):
+  with open(path, "w") as f:
+    json.dump(manifest, f, indent=2)
+
+
+def finish_batch_games(manifests: List[str]) -> List[Optional[Story]]:
+  """Collect the batch results saved in each manifest (see submit_batches) and play the rest of every game.
+  Collected first turns and finished games are recorded in the manifest so resuming never repeats paid work."""
+  results = []
+  for path in manifests:
+    with open(path, "r") as f:
+      manifest = json.load(f)
+    roles = {
+      "protagonist": parse_role(manifest["protagonist"], "protagonist"),
+      "antagonist": parse_role(manifest["antagonist"], "antagonist"),
+    }
+    role = roles[manifest["role"]]
+
+    pending = [game for game in manifest["games"] if not game.get("done") and "story" not in game]
+    if pending:
+      turns = [BatchTurn(role=role, message="", game_id=game["game_id"], use_case_step=game["use_case_step"]) for game in pending]
+      stories = collect_batch(role, manifest["batch_id"], turns) if manifest["batch_id"] else {}
+      for game in pending:
+        story = stories.get(game["custom_id"])
+        game["story"] = {"title": story.title, "content": story.content, "request_id": story.request_id} if story else None
+      save_manifest(path, manifest)
+
+    for game in manifest["games"]:
+      if game.get("done"):
+        logger.info("Game %s already finished, skipping", game["game_id"])
+        continue
+      story = Story(lines=[], **game["story"]) if game.get("story") else None
+      if not story:
+        # the game usually still finishes so this is not a game failure
+        logger.warning("Batch turn failed for game %s, writing first turn synchronously", game["game_id"])
+        add_game_property(game["game_id"], "batch.fallback", "sync")
+      order = [roles[type] for type in game["order"]]
+      try:
+        results.append(game_loop(game["prompt"], roles["protagonist"], roles["antagonist"], manifest["rounds"], game_id=game["game_id"], order=order, story=story))
+      except Exception as e:
+        logger.error(f"Game {game['game_id']} failed: {e}")
+        results.append(None)
+        continue
+      game["done"] = True
+      save_manifest(path, manifest)
+  return results
+
+
+def collect_batch(role: Role, batch_id: str, turns: List[BatchTurn]) -> dict:
+  """Wait for a batch job and parse its results. Returns {custom_id: Story or None}."""
+  status_response = poll_batch(role, batch_id)
+  results = batch_results(role, status_response) if status_response else {}
+  stories = {}
+  for turn in turns:
+    json_response = results.get(turn.custom_id)
+    if json_response is None:
+      stories[turn.custom_id] = None
+      continue
+    request_id = parse_request_id(role, json_response)
+    if request_id:
+      add_property(request_id, "batch", "true")
+      add_property(request_id, "batch_id", batch_id)
+    else:
+      request_id = ingest_batch_result(role, turn, status_response, json_response, batch_id)
+    stories[turn.custom_id] = receive_story(role, status_response, json_response, request_id, turn.use_case_step)
+  return stories
+
+
+def write_batch_file(role: Role, turns: List[BatchTurn], path: str) -> str:
+  """Write turns as a provider batch-job JSONL file (OpenAI Batch or Anthropic Message Batches)."""
+  with open(path, "w") as f:
+    for turn in turns:
+      body = story_request_body(role, turn.message, instructions=turn.instructions)
+      if role.provider == "anthropic":
+        line = {"custom_id": turn.custom_id, "params": body}
+      else:
+        line = {"custom_id": turn.custom_id, "method": "POST", "url": "/v1/responses", "body": body}
+      f.write(json.dumps(line) + "\n")
+  logger.info(f"Wrote batch file {path} ({len(turns)} requests)")
+  return path
+
+
+def submit_batch(role: Role, path: str) -> Optional[str]:
+  """Submit a batch-job file and return the provider batch ID."""
+  try:
+    return _submit_batch(role, path)
+  except Exception as e:
+    logger.error(f"Error submitting batch {path}: {e}")
+    return None
+
+
+def _submit_batch(role: Role, path: str) -> Optional[str]:
+  with open(path, "rb") as f:
+    data = f.read()
+
+  if role.provider == "anthropic":
+    # POST /v1/messages/batches takes the requests inline
+    url, headers = provider_route(role, "messages/batches", base_url=BATCH_API_URL, management=True)
+    requests = [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+    response = http_request("POST", url, headers=headers, json_body={"requests": requests})
+  else:
+    # POST /v1/files (purpose=batch) then POST /v1/batches
+    url, headers = provider_route(role, "files", base_url=BATCH_API_URL, management=True)
+    boundary = uuid.uuid4().hex
+    body = (
+      f"--{boundary}\r\n"
+      f"Content-Disposition: form-data; name=\"purpose\"\r\n\r\n"
+      f"batch\r\n"
+      f"--{boundary}\r\n"
+      f"Content-Disposition: form-data; name=\"file\"; filename=\"{os.path.basename(path)}\"\r\n"
+      f"Content-Type: application/jsonl\r\n\r\n"
+    ).encode("utf-8") + data + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+    response = http_request("POST", url, headers=headers, data=body)
+    if not response.ok:
+      logger.error(f"Error {response.status_code}: {response.text}")
+      return None
+    input_file_id = deep_string(response.json(), "id")
+    url, headers = provider_route(role, "batches", base_url=BATCH_API_URL, management=True)
+    response = http_request("POST", url, headers=headers, json_body={
+      "input_file_id": input_file_id,
+      "endpoint": "/v1/responses",
+      "completion_window": "24h",
+    })
+
+  if not response.ok:
+    logger.error(f"Error {response.status_code}: {response.text}")
+    return None
+  return deep_string(response.json(), "id") or None
+
+
+def poll_batch(role: Role, batch_id: str) -> Optional[SimpleHTTPResponse]:
+  """Poll a batch job until it ends and return the final status response. Network and server errors are retried until BATCH_TIMEOUT."""
+  path = f"messages/batches/{batch_id}" if role.provider == "anthropic" else f"batches/{batch_id}"
+  url, headers = provider_route(role, path, base_url=BATCH_API_URL, management=True)
+  deadline = time.monotonic() + BATCH_TIMEOUT
+  while True:
+    try:
+      response = http_request("GET", url, headers=headers)
+      if response.ok:
+        json_response = response.json()
+        if role.provider == "anthropic":
+          status = json_response.get("processing_status", "")
+          done = status == "ended"
+        else:
+          status = json_response.get("status", "")
+          done = status in ("completed", "failed", "expired", "cancelled")
+        logger.info(f"Batch {batch_id}: {status}")
+        if done:
+          return response
+      elif response.status_code == 429 or response.status_code >= 500:
+        logger.warning(f"Batch {batch_id}: error {response.status_code}, retrying: {response.text}")
+      else:
+        logger.error(f"Error {response.status_code}: {response.text}")
+        return None
+    except Exception as e:
+      logger.warning(f"Batch {batch_id}: {e}, retrying")
+    if time.monotonic() > deadline:
+      logger.error(f"Batch {batch_id} did not finish within {BATCH_TIMEOUT} seconds")
+      return None
+    time.sleep(BATCH_POLL_INTERVAL)
+
+
+def batch_results(role: Role, status_response: SimpleHTTPResponse) -> dict:
+  """Download the results of an ended batch job. Returns {custom_id: provider JSON response} for successes."""
+  try:
+    status = status_response.json()
+  except Exception as e:
+    logger.error(f"Error decoding batch status: {status_response.text} ({e})")
+    return {}
+  if role.provider == "anthropic":
+    path = f"messages/batches/{status.get('id')}/results"
+  else:
+    if not status.get("output_file_id"):
+      logger.error(f"Batch {status.get('id')} has no output file ({status.get('status')})")
+      return {}
+    path = f"files/{status['output_file_id']}/content"
+  url, headers = provider_route(role, path, base_url=BATCH_API_URL, management=True)
+
+  response = None
+  for attempt in range(1, BATCH_RETRIES + 1):
+    try:
+      response = http_request("GET", url, headers=headers)
+      if response.ok or (response.status_code != 429 and response.status_code < 500):
+        break
+      logger.warning(f"Batch {status.get('id')} results: error {response.status_code} (attempt {attempt} of {BATCH_RETRIES})")
+    except Exception as e:
+      response = None
+      logger.warning(f"Batch {status.get('id')} results: {e} (attempt {attempt} of {BATCH_RETRIES})")
+    if attempt < BATCH_RETRIES:
+      time.sleep(BATCH_POLL_INTERVAL)
+  if response is None or not response.ok:
+    if response is not None:
+      logger.error(f"Error {response.status_code}: {response.text}")
+    return {}
+
+  results = {}
+  for line in response.text.splitlines():
+    if not line.strip():
+      continue
+    try:
+      entry = json.loads(line)
+    except ValueError as e:
+      logger.error(f"Error decoding batch result line: {line} ({e})")
+      continue
+    custom_id = entry.get("custom_id")
+    if role.provider == "anthropic":
+      result = entry.get("result") or {}
+      if result.get("type") == "succeeded":
+        results[custom_id] = result.get("message")
+      else:
+        logger.error(f"Batch request {custom_id} {result.get('type')}: {result.get('error')}")
+    else:
+      result = entry.get("response") or {}
+      if result.get("status_code") == 200:
+        results[custom_id] = result.get("body")
+      else:
+        logger.error(f"Batch request {custom_id} failed: {entry.get('error') or result.get('body')}")
+  return results
+
+
+def ingest_batch_result(role: Role, turn: BatchTurn, response: SimpleHTTPResponse, json_response: dict, batch_id: str) -> Optional[str]:
+  """Ingest a batch result the proxy did not see so it is attached to its game in Pay-i. Returns the request ID.
+  Batch calls are billed at a discount so the event is marked with batch/batch_id."""
+  usage = json_response.get("usage") or {}
+  # POST /api/v1/ingest Ingest an Event
+  r = payi("api/v1/ingest", json_body={
+    "category": role.category,
+    "resource": role.resource or role.model,
+    "units": {
+      "text": {
+        "input": usage.get("input_tokens", 0),
+        "output": usage.get("output_tokens", 0),
+      }
+    },
+    "request_properties": {
+      "batch": "true",
+      "batch_id": batch_id,
+      "system.account_name": parse_account_name(role, response, json_response),
+      "system.use_case_step": turn.use_case_step,
+      "system.user_id": parse_user_id(role, response, json_response),
+    }
+  }, method="POST", headers={
+    "xProxy-UseCase-Name": "Story",
+    "xProxy-UseCase-ID": turn.game_id,
+  })
+  if r is None:
+    return None
+  return deep_string(r, "request_id") or None
+
+
 def parse_user_id(role: Role, response: SimpleHTTPResponse, json_response: dict) -> str:
   """Parse the user ID from the response or JSON response."""
   if role.provider == "openai":
@@ -648,10 +1214,39 @@ if __name__ == "__main__":
       dest="temperature",
       help=f"Override sampling temperature (default: ${TEMPERATURE})",
   )
+  parser.add_argument(
+      "--compact",
+      type=lambda v: cast_str.to_list(v, ","),
+      dest="compact_roles",
+      metavar="ROLES",
+      help=f"Comma-separated role types or PROVIDER.MODEL to send compacted stories in later rounds (default: ${','.join(COMPACT_ROLES)})",
+  )
+  parser.add_argument(
+      "--batch",
+      metavar="FILE",
+      help="Play one game per seed prompt in FILE (one per line, - for stdin) with first turns sent as provider batch jobs",
+  )
+  parser.add_argument(
+      "--resume-batch",
+      nargs="+",
+      metavar="MANIFEST",
+      dest="resume_batch",
+      help=f"Resume games from the .batch.json manifests saved by --batch (in ${BATCH_DIR})",
+  )
   parsed = parser.parse_args()
 
+  prompts = []
+  if parsed.batch:
+    if parsed.batch == "-":
+      prompts = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+      with open(parsed.batch, "r") as f:
+        prompts = [line.strip() for line in f if line.strip()]
+    if not prompts:
+      parser.error(f"no prompts found in {parsed.batch}")
+
   prompt = parsed.prompt_arg if parsed.prompt_arg is not None else parsed.prompt
-  if prompt is None or prompt == "":
+  if not prompts and not parsed.resume_batch and (prompt is None or prompt == ""):
     parser.error("the following arguments are required: prompt")
 
   if parsed.rounds is None or parsed.rounds <= 0:
@@ -665,6 +1260,13 @@ if __name__ == "__main__":
     REASONING_EFFORT = parsed.reasoning_effort
   if parsed.temperature is not None:
     TEMPERATURE = parsed.temperature
+  if parsed.compact_roles is not None:
+    COMPACT_ROLES = [value.strip() for value in parsed.compact_roles if value.strip()]
+
+  # resumed games take their roles from the batch manifests
+  if parsed.resume_batch:
+    finish_batch_games(parsed.resume_batch)
+    sys.exit(0)
 
   try:
     protagonist = parsed.protagonist or parse_role(DEFAULT_PROTAGONIST, "protagonist")
@@ -675,4 +1277,7 @@ if __name__ == "__main__":
   except argparse.ArgumentTypeError as exc:
     parser.error(f"invalid default antagonist: {exc}")
 
-  game_loop(prompt, protagonist, antagonist, parsed.rounds)
+  if prompts:
+    batch_game_loop(prompts, protagonist, antagonist, parsed.rounds)
+  else:
+    game_loop(prompt, protagonist, antagonist, parsed.rounds)
@@ -3,6 +3,12 @@
 ADVERSTORIAL_DIR="$(cd "$(dirname "$0")" && pwd)"
 WORDLISTS_DIR="$ADVERSTORIAL_DIR/wordlists"
 
+# prefer the compiled, frequency-filtered vocabulary (rebuilt automatically when a wordlist changes)
+if prompt="$(python3 "$ADVERSTORIAL_DIR/seed_vocab.py")" && [ -n "$prompt" ]; then
+  echo "$prompt"
+  exit 0
+fi
+
 # shuf is not available on macOS by default, so using sort -R as an alternative
 # (Linux has sort -R as part of GNU coreutils)
 function random_word() {
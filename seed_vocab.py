@@ -0,0 +1,220 @@
+"""Compile wordlists/ into a frequency-filtered seed vocabulary and draw seed prompts from it.
+
+The compiled vocabulary is saved as one alias table per part of speech so each weighted draw is O(1).
+It is rebuilt only when a source list (or the build settings) change.
+"""
+import argparse
+import cast_str
+import hashlib
+import json
+import os
+import logging
+import random
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ADVERSTORIAL_DIR = os.path.dirname(os.path.abspath(__file__))
+WORDLISTS_DIR = os.path.join(ADVERSTORIAL_DIR, "wordlists")
+# relative paths are taken relative to this directory, not the caller's (cron runs us from elsewhere)
+SEED_VOCAB_PATH = os.path.join(ADVERSTORIAL_DIR, os.environ.get("SEED_VOCAB_PATH", os.path.join("wordlists", "vocab.json")))
+SEED_MIN_SCORE = cast_str.to_int(os.environ["SEED_MIN_SCORE"]) if os.environ.get("SEED_MIN_SCORE") else None  # overrides the per-part-of-speech minimum
+SEED_MAX_WEIGHT = cast_str.to_int(os.environ.get("SEED_MAX_WEIGHT", "8"))
+VOCAB_VERSION = 3
+
+# english.txt is alphabetical rather than ranked, so commonness is the number of inflected/derived
+# forms of a word it lists (common words have many: run, runs, running, runner...), counting only the
+# suffixes that part of speech takes so verb endings don't inflate nouns
+COMMON_WORDS = "english.txt"
+VERB_SUFFIXES = ("s", "es", "d", "ed", "ing", "er", "ers")
+NOUN_SUFFIXES = ("s", "es", "'s", "ful", "less", "ish", "like", "y")
+ADJECTIVE_SUFFIXES = ("er", "est", "ly", "ness")
+SUFFIXES = VERB_SUFFIXES + NOUN_SUFFIXES + ADJECTIVE_SUFFIXES
+
+# the lists overlap heavily ("mountain" is listed as an adjective, "see" as a noun), so a word that is
+# also another part of speech is only kept if it shows forms of this one
+VERB_EVIDENCE = ("ed", "ing")
+NOUN_EVIDENCE = ("es", "'s", "ful", "less", "ish", "like", "y")
+ADJECTIVE_EVIDENCE = ("est", "ly", "ness")  # not -er, which is also an agent noun (beveler)
+
+# part of speech -> (source file, column to keep, column to score, scoring suffixes, minimum score)
+SOURCES = {
+  "adjective": ("adjectives.csv", 0, 0, ADJECTIVE_SUFFIXES, 4),
+  "noun": ("nouns.csv", 0, 0, NOUN_SUFFIXES, 3),  # singular
+  "adverb": ("adverbs.csv", 0, 0, SUFFIXES, 5),  # scored by their adjective
+  "verb": ("verbs.csv", 1, 0, SUFFIXES, 5),  # simple past reads naturally: "<adjective> <noun> <adverb> <verb> <noun>"
+}
+
+# order of parts of speech in a seed prompt
+SEED_PATTERN = ("adjective", "noun", "adverb", "verb", "noun")
+
+
+def source_hashes() -> dict:
+  """SHA-256 of every source list used by the build."""
+  hashes = {}
+  for name in sorted({COMMON_WORDS} | {source[0] for source in SOURCES.values()}):
+    digest = hashlib.sha256()
+    with open(os.path.join(WORDLISTS_DIR, name), "rb") as f:
+      for chunk in iter(lambda: f.read(1 << 20), b""):
+        digest.update(chunk)
+    hashes[name] = digest.hexdigest()
+  return hashes
+
+
+def build_settings() -> dict:
+  return {"version": VOCAB_VERSION, "min_score": SEED_MIN_SCORE, "max_weight": SEED_MAX_WEIGHT}
+
+
+def normalize(word: str, min_length: int = 3) -> Optional[str]:
+  """Normalize a raw list entry. Returns None for anything that isn't a plain lowercase word (numbers, proper nouns, hyphenations)."""
+  word = unicodedata.normalize("NFKC", word).strip()
+  if len(word) < min_length or not re.fullmatch(r"[a-z]+", word):
+    return None
+  return word
+
+
+def word_forms(word: str, suffixes: Tuple[str, ...]) -> set:
+  """Candidate forms of word with each suffix, including spelling changes (baking, happier, running)."""
+  forms = set()
+  for suffix in suffixes:
+    forms.add(word + suffix)
+    vowel = suffix[0] in "aeiouy"
+    if word.endswith("e") and vowel:  # bake -> baking, baker
+      forms.add(word[:-1] + suffix)
+    if re.search(r"[^aeiou]y$", word) and not suffix.startswith("i"):  # happy -> happier, happily, happiness
+      forms.add(word[:-1] + "i" + ("es" if suffix == "s" else suffix))
+    if re.search(r"[^aeiou][aeiou][b-df-hj-np-tvz]$", word) and vowel:  # run -> running, big -> bigger
+      forms.add(word + word[-1] + suffix)
+  return forms - {word}
+
+
+def count_forms(word: str, suffixes: Tuple[str, ...], english: set) -> int:
+  return sum(form in english for form in word_forms(word, suffixes))
+
+
+def commonness(word: str, english: set, suffixes: Tuple[str, ...] = SUFFIXES) -> int:
+  """Score a word by how many of its forms english.txt lists (0 if the word itself is missing)."""
+  if word not in english:
+    return 0
+  score = 1 + count_forms(word, suffixes, english)
+  # adverbs rarely inflect, so score them by their adjective (quickly -> quick, happily -> happy, gently -> gentle)
+  if word.endswith("ly"):
+    for base in (word[:-2], word[:-3] + "y", word[:-1] + "e"):
+      if len(base) >= 3 and base != word and base in english:
+        score = max(score, commonness(base, english, suffixes))
+  return score
+
+
+def other_reading(pos: str, word: str, english: set, readings: dict) -> bool:
+  """True if word reads mainly as another part of speech, e.g. the adjective "mountain" or the noun "see"."""
+  if pos == "noun":
+    if word in readings["verb"]:
+      return True
+    verb = count_forms(word, VERB_EVIDENCE, english)  # lick -> licked, licking
+    return verb >= 2 and verb > count_forms(word, NOUN_EVIDENCE, english)
+  if pos == "adjective":
+    return (word in readings["noun"] or word in readings["verb"]) and not count_forms(word, ADJECTIVE_EVIDENCE, english)
+  if pos == "adverb":
+    return (word in readings["noun"] or word in readings["verb"] or word in readings["adjective"]) and not word.endswith("ly")
+  return False
+
+
+def alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+  """Build a Vose alias table for O(1) weighted draws. Returns (prob, alias)."""
+  n = len(weights)
+  total = sum(weights)
+  scaled = [w * n / total for w in weights]
+  prob = [0.0] * n
+  alias = list(range(n))
+  small = [i for i, p in enumerate(scaled) if p < 1.0]
+  large = [i for i, p in enumerate(scaled) if p >= 1.0]
+  while small and large:
+    s = small.pop()
+    l = large.pop()
+    prob[s] = scaled[s]
+    alias[s] = l
+    scaled[l] = scaled[l] + scaled[s] - 1.0
+    (small if scaled[l] < 1.0 else large).append(l)
+  for i in small + large:  # leftovers are 1.0 up to rounding error
+    prob[i] = 1.0
+  return prob, alias
+
+
+def build_vocab(path: str = SEED_VOCAB_PATH) -> dict:
+  """Compile the source lists into alias tables and save them to path."""
+  with open(os.path.join(WORDLISTS_DIR, COMMON_WORDS), "r", encoding="utf-8") as f:
+    english = {line.strip().lower() for line in f if line.strip()}
+
+  rows = {}
+  readings = {}
+  for pos, (name, keep_column, score_column, _, _) in SOURCES.items():
+    rows[pos] = []
+    with open(os.path.join(WORDLISTS_DIR, name), "r", encoding="utf-8") as f:
+      for line in f:
+        columns = line.rstrip("\r\n").split(",")
+        if len(columns) > max(keep_column, score_column):
+          rows[pos].append(columns)
+    # only a verb's base form counts as a reading, so "ground" stays a noun and "broken" an adjective
+    readings[pos] = {normalize(columns[score_column]) for columns in rows[pos]} - {None}
+
+  tables = {}
+  for pos, (name, keep_column, score_column, suffixes, min_score) in SOURCES.items():
+    weights = {}
+    for columns in rows[pos]:
+      word = normalize(columns[keep_column])
+      base = normalize(columns[score_column], min_length=2)  # go, do, be
+      if not word or not base or word in weights or other_reading(pos, word, english, readings):
+        continue
+      score = commonness(base, english, suffixes)
+      if score >= (SEED_MIN_SCORE or min_score):
+        weights[word] = min(score, SEED_MAX_WEIGHT)
+    words = list(weights)
+    prob, alias = alias_table([weights[w] for w in words])
+    tables[pos] = {"words": words, "prob": [round(p, 4) for p in prob], "alias": alias}
+    logger.info(f"{pos}: kept {len(words)} words from {name}")
+
+  vocab = {"settings": build_settings(), "sources": source_hashes(), "tables": tables}
+  with open(path, "w", encoding="utf-8") as f:
+    json.dump(vocab, f, separators=(",", ":"))
+  logger.info(f"Wrote {path}")
+  return vocab
+
+
+def load_vocab(path: str = SEED_VOCAB_PATH) -> dict:
+  """Load the compiled vocabulary, rebuilding it first if a source list or setting changed."""
+  try:
+    with open(path, "r", encoding="utf-8") as f:
+      vocab = json.load(f)
+  except (OSError, ValueError):
+    vocab = None
+  if not vocab or vocab.get("settings") != build_settings() or vocab.get("sources") != source_hashes():
+    logger.info("Seed vocabulary is missing or stale, rebuilding")
+    vocab = build_vocab(path)
+  return vocab
+
+
+def draw(table: dict, rng=random) -> str:
+  """O(1) weighted draw from an alias table."""
+  i = rng.randrange(len(table["words"]))
+  if rng.random() < table["prob"][i]:
+    return table["words"][i]
+  return table["words"][table["alias"][i]]
+
+
+def seed_prompt(vocab: dict, rng=random) -> str:
+  return " ".join(draw(vocab["tables"][pos], rng) for pos in SEED_PATTERN)
+
+
+if __name__ == "__main__":
+  logging.basicConfig(level=os.environ.get("PYTHONLOGGING", "INFO"))
+  parser = argparse.ArgumentParser(description="Print a random seed prompt from the compiled seed vocabulary")
+  parser.add_argument("--build", action="store_true", help="Force a rebuild of the vocabulary")
+  parser.add_argument("--path", default=SEED_VOCAB_PATH, help=f"Compiled vocabulary path (default: {SEED_VOCAB_PATH})")
+  parsed = parser.parse_args()
+
+  if parsed.build:
+    build_vocab(parsed.path)
+  else:
+    print(seed_prompt(load_vocab(parsed.path)))